@@ -2,17 +2,206 @@
 Carrot module. 🥕yay🥕
 """
 
-from concurrent.futures.process import _threads_wakeups
-import json
-from typing import Union
+import csv
+import re
+from array import array
+import sys
+from collections import Counter, OrderedDict
+from itertools import chain, compress, count, groupby, islice, repeat, zip_longest
+from operator import eq
+from typing import Iterator, Union
 from io import TextIOWrapper
 
 
 class CarrotError(BaseException): pass # base exception
 
 
+_INT = re.compile(r'[-+]?[0-9]+')
+_FLOAT = re.compile(r'[-+]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?')
+
+
+_LITERAL_STARTS = ('[', '(', '{', 'True', 'False', "b'", 'b"') # strings and None are never written back as they are read
+
+
+def _literal_eval(value: str):
+    """
+    ast.literal_eval, only loaded when needed to keep importing Carrot fast.
+    """
+
+    global _literal_eval
+    from ast import literal_eval as _literal_eval # replaces this function on first call
+
+    return _literal_eval(value)
+
+
+def _written(value) -> str:
+    """
+    Returns the text a slot is written as in the file.
+    """
+
+    return '' if value is None else str(value)
+
+
+def _literal(value: str):
+    """
+    Returns the python literal written in a slot, or the slot itself if it isn't one.
+    Already typed slots, and slots that wouldn't be written back as the same text
+    (like '1_000', ' 42 ', '007' or 'None'), are left as they are.
+    """
+
+    if not isinstance(value, str) or value != value.strip(): return value
+
+    if _INT.fullmatch(value): literal = int(value)
+    elif _FLOAT.fullmatch(value): literal = float(value)
+
+    # Only parse the slots that can be a literal written back as the same text
+    elif not value.startswith(_LITERAL_STARTS): return value
+
+    else:
+        try: literal = _literal_eval(value)
+        except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError): return value
+
+        if type(literal) in (int, float, complex): return value
+
+    return literal if _written(literal) == value else value
+
+
+def _infer(column: list) -> list:
+    """
+    Returns a column with its slots converted to their type.
+    Tries to cast the whole column to int, then to float, and
+    only falls back to reading each slot when that doesn't write back as the same text.
+    A column is typed all or nothing: if its slots don't all get the same type
+    (ints and floats being both numbers), it is returned as it is.
+    """
+
+    try:
+        for pattern, cast in ((_INT, int), (_FLOAT, float)):
+            if all(map(pattern.fullmatch, column)):
+                typed = list(map(cast, column))
+                if all(map(eq, map(_written, typed), column)): return typed
+                break # a float cast won't write them back either
+
+    except TypeError: pass # some slots are already typed
+
+    typed = list(map(_literal, column))
+    types = set(map(type, typed))
+
+    return typed if len(types) <= 1 or types == {int, float} else column
+
+
+class _CategoricalColumn:
+    """
+    Column storing each distinct slot once (its dictionary),
+    and for each line the code of its slot in a compact array.
+    Behaves like a list of slots.
+    Slots are told apart by type too, so 1, 1.0 and True keep their own code.
+    """
+
+    def __init__(self, column: list) -> None:
+        keys = list(dict.fromkeys(map(_CategoricalColumn._key, column)))
+
+        self.dictionary: list = [value for _, value in keys]
+        self._codes: dict = {key: code for code, key in enumerate(keys)} # (type, slot) -> code
+        self.codes: array = array('B' if len(keys) <= 0x100 else 'H' if len(keys) <= 0x10000 else 'L',
+                                  map(self._codes.__getitem__, map(_CategoricalColumn._key, column)))
+
+    @staticmethod
+    def _key(value) -> tuple:
+        return (type(value), value)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __iter__(self) -> Iterator:
+        return map(self.dictionary.__getitem__, self.codes)
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice): return list(map(self.dictionary.__getitem__, self.codes[index]))
+        return self.dictionary[self.codes[index]]
+
+    def __setitem__(self, index: Union[int, slice], value) -> None:
+        if isinstance(index, slice):
+            codes = list(map(self._encode, value))
+            self.codes[index] = array(self.codes.typecode, codes)
+
+        else: self.codes[index] = self._encode(value)
+
+    def _encode(self, value) -> int:
+        """
+        Returns the code of a slot, adding it to the dictionary if needed.
+        """
+
+        key = self._key(value)
+
+        code = self._codes.get(key)
+        if code is not None: return code
+
+        code = self._codes[key] = len(self.dictionary)
+        self.dictionary.append(value)
+
+        # Widen the codes when they don't fit anymore
+        if code == 0x100: self.codes = array('H', self.codes)
+        elif code == 0x10000: self.codes = array('L', self.codes)
+
+        return code
+
+    def append(self, value) -> None:
+        code = self._encode(value) # may widen self.codes, so encode before getting it
+        self.codes.append(code)
+
+    def index(self, value) -> int:
+        try: return next(self.matches(value))
+        except StopIteration: raise ValueError(f'{value!r} is not in column') from None
+
+    def take(self, ids: list) -> Iterator:
+        """
+        Iterate over the slots of the given lines.
+        """
+
+        return map(self.dictionary.__getitem__, map(self.codes.__getitem__, ids))
+
+    def recode(self, dictionary: list) -> None:
+        """
+        Replace the slots of the dictionary by the given ones, in the same order.
+        Slots that become the same share a single code.
+        """
+
+        keys = {}
+        remap = [keys.setdefault(key, len(keys)) for key in map(self._key, dictionary)]
+
+        self.dictionary = [value for _, value in keys]
+        self._codes = keys
+
+        if remap != list(range(len(remap))): self.codes = array(self.codes.typecode, map(remap.__getitem__, self.codes))
+
+    def reorder(self, order: list) -> None:
+        """
+        Move the slots so that the new i-th slot is the old order[i]-th one.
+        """
+
+        self.codes = array(self.codes.typecode, map(self.codes.__getitem__, order))
+
+    def matches(self, value) -> Iterator[int]:
+        """
+        Returns the ids of the lines where the slot equals value.
+        """
+
+        # Several dictionary slots can equal value (1 == 1.0 == True)
+        codes = list(compress(count(), map(eq, self.dictionary, repeat(value))))
+
+        if not codes: return iter(())
+        if len(codes) == 1: return compress(count(), map(eq, self.codes, repeat(codes[0])))
+
+        return compress(count(), map(set(codes).__contains__, self.codes))
+
+
 class BaseCarrot:
 
+    indexCacheSize: int = 8 # max number of column indexes kept at once
+    parseBlockSize: int = 10000 # number of lines transposed at once when parsing
+    compressRatio: float = .5 # columns with less distinct slots than this ratio get compressed
+
     # === magic === #
 
     def __init__(self, file: TextIOWrapper, sep: str = ',', _doParse = True) -> None:
@@ -24,12 +213,18 @@ class BaseCarrot:
         self.sep = sep
 
         self.columns: list = None
-        self.lines: list = None
+        self._cols: list = [] # slots of each column (list or _CategoricalColumn), in the columns order
+        self._ragged = 0 # number of lines in the file that aren't as long as the columns
+        self._col_idx: dict = None
+        self._indices: OrderedDict = OrderedDict() # column name -> {slot value: line ids}
+        self._dirty = False # wether the file is behind the content
+        self._display_cache: tuple = None # (seps, formated csv)
 
         if _doParse: self.parse()
         # self.isOk = self.verify_integrity()
 
         self.isSorted = False
+        self._sortedBy: str = None
     
     def __str__(self) -> str:
         """
@@ -37,6 +232,34 @@ class BaseCarrot:
         """
         return {'columns': self.columns, 'lines': self.lines}
 
+    def __enter__(self) -> 'BaseCarrot':
+        """
+        Batch modifications: the file is written once, and closed, when leaving the with block.
+        Modifications are not written if the block raises.
+        """
+
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if exc[0] is not None: self._dirty = False
+        self.close()
+
+    def __len__(self) -> int:
+        """
+        Returns the number of lines.
+        """
+
+        return len(self._cols[0]) if self._cols else 0
+
+    @property
+    def lines(self) -> list:
+        """
+        The lines of the csv, rebuilt from the columns.
+        They are copies: edit the csv through set, setAll, add, etc.
+        """
+
+        return list(self._iter_rows())
+
     # === Utilities === #
 
     def parse(self) -> None:
@@ -44,18 +267,73 @@ class BaseCarrot:
         Parse the content of the csv file into readable object.
         """
 
-        self.lines = list(map(lambda l: tuple(l.split(self.sep)), self.file.read().rstrip().split('\n')))
-        self.columns = self.lines.pop(0)
+        rows = self.parse_iter()
+
+        self.columns = list(map(sys.intern, next(rows, [])))
+        self._index_columns()
+
+        columns = [[] for _ in self.columns]
+        width = len(self.columns)
+        self._ragged = 0
+
+        # Transpose the lines into columns one block at a time, so the lines are never all held at once.
+        # The header is transposed too so that every column gets its slots; short lines are padded,
+        # extra slots dropped. Such lines are counted so verify_integrity can report them.
+        while block := list(islice(rows, self.parseBlockSize)):
+            self._ragged += sum(len(row) != width for row in block)
+
+            for column, slots in zip(columns, zip_longest(self.columns, *block, fillvalue = '')):
+                column.extend(islice(slots, 1, None))
+
+        self._cols = list(map(self._compress, columns))
+        self._indices.clear()
+        self._display_cache = None
+
+    def _compress(self, column: list) -> Union[list, _CategoricalColumn]:
+        """
+        Returns a lighter storage for a column if it has few distinct values:
+        dictionary encoded if there are at most 256 of them, else with its strings interned.
+        """
+
+        try: distinct = len(set(column))
+        except TypeError: return column # unhashable slots
+
+        if not column or distinct >= self.compressRatio * len(column): return column
+        if distinct <= 0x100: return _CategoricalColumn(column)
+
+        return [sys.intern(value) if isinstance(value, str) else value for value in column]
+
+    def parse_iter(self) -> Iterator[list]:
+        """
+        Iterate over the rows of the csv file without storing them.
+        The first row yielded is the columns. Empty lines are skipped.
+        """
+
+        self.file.seek(0)
+
+        yield from filter(None, csv.reader(self.file, delimiter = self.sep))
+
+    def close(self) -> None:
+        """
+        Write the pending modifications, then close the file.
+        The file is closed even if writing fails.
+        """
+
+        try: self.flush()
+        finally: self.file.close()
     
     def _verify_integrity(self, _ErrorValue: str = None) -> bool:
         """
         Verify if all the lines have the same length than the first one.
         Returns True if test passed else False or an error value.
+        Lines are stored as columns, so this checks no line was malformed in the file
+        and all the columns have the same length.
         """
 
-        lengths = list(map(len, self.lines))
+        length = len(self)
 
-        if len(list(filter((len(self.columns)).__ne__, lengths))): return False if _ErrorValue is None else _ErrorValue
+        if self._ragged or len(self._cols) != len(self.columns) or any(len(column) != length for column in self._cols):
+            return False if _ErrorValue is None else _ErrorValue
         return True
 
     def display(self, seps = (' | ', '\n')) -> None:
@@ -63,19 +341,117 @@ class BaseCarrot:
         Display the content of the csv.
         """
 
-        formated_cols = seps[0].join(self.columns)
+        # Format the csv only once, until it gets modified
+        if self._display_cache is None or self._display_cache[0] != seps:
+            formated_cols = seps[0].join(self.columns)
+            formated_lines = seps[1].join(seps[0].join(map(str, line)) for line in self._iter_rows())
+
+            self._display_cache = (seps, f'\033[1m {formated_cols}\n{"-" * len(formated_cols)} \033[0m\n{formated_lines}\n')
 
-        print('\033[1m', formated_cols)
-        print('-' * len(formated_cols), '\033[0m')
-        print(seps[1].join(map(seps[0].join, self.lines)))
+        sys.stdout.write(self._display_cache[1])
     
+    def _index_columns(self) -> None:
+        """
+        Build the column name -> column id lookup table.
+        A name used by several columns refers to the first one.
+        """
+
+        self._col_idx = {}
+        for i, col in enumerate(self.columns): self._col_idx.setdefault(col, i)
+
     def _column_id(self, columnName: str) -> int:
         """
         Returns the id associated to a column (it's just its place in the list).
         """
 
-        if not columnName in self.columns: raise CarrotError('Couldn\'t find this column. Weird.')
-        return self.columns.index(columnName)
+        try: return self._col_idx[columnName]
+        except KeyError: raise CarrotError('Couldn\'t find this column. Weird.') from None
+
+    def _column(self, columnName: str) -> list:
+        """
+        Returns the list of slots of a column.
+        """
+
+        return self._cols[self._column_id(columnName)]
+
+    def _matches(self, column: list, data) -> Iterator[int]:
+        """
+        Returns the ids of the lines where the column slot equals data.
+        The comparison runs in C, only the matching ids reach python.
+        """
+
+        if isinstance(column, _CategoricalColumn): return column.matches(data)
+
+        return compress(count(), map(eq, column, repeat(data)))
+
+    def _match_forms(self, columnMatch) -> tuple:
+        """
+        Returns the values to compare slots with, in order: columnMatch as given,
+        then as written in the file for columns that weren't typed,
+        or as the literal it holds for typed ones (see correctType).
+        """
+
+        if not isinstance(columnMatch, str): return (columnMatch, _written(columnMatch))
+
+        literal = _literal(columnMatch)
+        return (columnMatch,) if literal is columnMatch else (columnMatch, literal)
+
+    def _match_ids(self, column_name: str, data) -> Iterator[int]:
+        """
+        Returns the ids of the lines of a column matching data, using the
+        first of its forms (see _match_forms) that matches any line.
+        Every read and write method matches slots through this.
+        """
+
+        column = self._column(column_name)
+
+        for form in self._match_forms(data):
+            ids = self._lookup(column_name, form)
+            ids = iter(self._matches(column, form) if ids is None else ids)
+
+            first = next(ids, None)
+            if first is not None: return chain((first,), ids)
+
+        return iter(())
+
+    def _invalidate(self, column_name: str) -> None:
+        """
+        Forget the index and sorting of a column that gets modified.
+        """
+
+        self._indices.pop(column_name, None)
+        if column_name == self._sortedBy: self.isSorted = False
+
+    def _lookup(self, column_name: str, data) -> Union[None, list]:
+        """
+        Returns the ids of the lines matching data using the column index,
+        or None if the column isn't indexed (or data can't be looked up in it).
+        """
+
+        index = self._indices.get(column_name)
+        if index is None: return None
+
+        self._indices.move_to_end(column_name)
+
+        try: return index.get(data, [])
+        except TypeError: return None # unhashable data, let the caller scan the column
+
+    def _row(self, index: int) -> tuple:
+        """
+        Rebuild a line from the columns.
+        """
+
+        return tuple(column[index] for column in self._cols)
+
+    def _rows(self, ids: Iterator[int]) -> list:
+        """
+        Rebuild several lines at once, gathering each column in a single C-level pass.
+        """
+
+        ids = list(ids)
+        slots = (column.take(ids) if isinstance(column, _CategoricalColumn) else map(column.__getitem__, ids) for column in self._cols)
+
+        return list(zip(*slots))
 
     def submit(self, sep = None) -> None:
         """
@@ -84,51 +460,122 @@ class BaseCarrot:
 
         sep = self.sep if sep is None else sep
 
-        raw = sep.join(self.columns) + '\n'.join([sep.join(line) for line in self.lines])
+        self.file.seek(0)
+        self.file.truncate()
+
+        writer = csv.writer(self.file, delimiter = sep, lineterminator = '\n')
+        writer.writerow(self.columns)
+        writer.writerows(self._iter_rows())
+        self.file.flush()
+
+        self._dirty = False
+        self._ragged = 0 # every line was written as long as the columns
+
+    def flush(self) -> None:
+        """
+        Write the pending modifications to the file, if any.
+        """
+
+        if self._dirty: self.submit()
+
+    def _commit(self, _submit: bool) -> None:
+        """
+        Mark the content as modified, and update the file right away if asked to.
+        """
+
+        self._dirty = True
+        self._display_cache = None
+        if _submit: self.submit()
+
+    def _append(self, line: tuple) -> None:
+        """
+        Write a single line at the end of the file, without rewriting the rest.
+        The line ends like the last line of the file.
+        Falls back to rewriting the file for text files without a binary buffer (like StringIO),
+        and when the last line has no line terminator to copy.
+        """
+
+        buffer = getattr(self.file, 'buffer', None)
+        if buffer is None: return self.submit()
+
+        self.file.flush()
+        end = buffer.seek(0, 2)
+
+        buffer.seek(max(end - 2, 0))
+        last = buffer.read()
+
+        if last.endswith(b'\r\n'): terminator = '\r\n'
+        elif last.endswith(b'\n') or not end: terminator = '\n'
+        else: return self.submit() # the new line would be glued to the last one
+
+        self.file.seek(0, 2)
+
+        csv.writer(self.file, delimiter = self.sep, lineterminator = terminator).writerow(line)
+        self.file.flush()
+
+    def _iter_rows(self) -> Iterator[tuple]:
+        """
+        Iterate over the lines, rebuilding them from the columns one at a time.
+        """
 
-        self.file.write(raw)
+        return zip(*self._cols)
 
-    def correctType(self, _submit = True) -> None:
+    def correctType(self, _submit = False) -> None:
         """
         Attempts to correct the type of each slot.
         For instance, string '4' will be changed as int 4.
         """
 
-        for line in self.lines: line = [eval(el) for el in line]
+        for i, column in enumerate(self._cols):
+            # Dictionary encoded columns only need their distinct slots converted
+            if isinstance(column, _CategoricalColumn): column.recode(_infer(column.dictionary))
+            else: self._cols[i] = self._compress(_infer(column))
 
-        if _submit: self.submit()
+        self._indices.clear()
+        self.isSorted = False
+
+        self._commit(_submit)
 
     # === Read methods === #
 
+    def buildIndex(self, column_name: str) -> None:
+        """
+        Index a column, so find and findAll don't have to scan it anymore.
+        Only the last indexCacheSize indexed columns are kept.
+        """
+
+        index = {}
+
+        try:
+            for i, value in enumerate(self._column(column_name)): index.setdefault(value, []).append(i)
+        except TypeError: raise CarrotError('Can\'t index a column containing unhashable slots.') from None
+
+        self._indices[column_name] = index
+        self._indices.move_to_end(column_name)
+
+        while len(self._indices) > self.indexCacheSize: self._indices.popitem(last = False)
+
     def find(self, column_name: str, data: str) -> tuple:
         """
         Returns the first name it finds from a given column.
         """
 
-        column_id = self._column_id(column_name)
+        line_id = next(self._match_ids(column_name, data), None)
 
-        for line in self.lines:
-            if line[column_id] == data: return line
-        
-        return None
+        return None if line_id is None else self._row(line_id)
     
     def findAll(self, column_name: str, data: str) -> list:
         """
         Attempts to find matching names from a column.
         """
 
-        column_id = self._column_id(column_name)
-
-        matchs = []
-
-        for line in self.lines:
-            if line[column_id] == data: matchs.append(line)
+        matchs = self._rows(self._match_ids(column_name, data))
 
         return matchs if len(matchs) else None
     
     def findCriteria(self, criteria: dict = None) -> list:
         """
-        Find all occurences that correspond to the given criterias.
+        Find all the lines that correspond to all the given criterias.
         Criteria can be a value: {'columnName': 'matchingValue'}
         Or a function that will return wether the value correspond : {'columnName': isValid}
         (where isValid is a function).
@@ -136,47 +583,45 @@ class BaseCarrot:
         If you want criterias to handle multiple values / functions per line, use a tuple to enter the values / functions.
         """
 
-        matchs = []
-
-        for line in self.lines:
-            for col, value in criteria:
-                col_id = self._column_id(col)
-
-                # if crit is a tuple, iterate trou it.
-                if isinstance(value, tuple):
-                    for crit in value:
-                        
-                        # if value is string -> check if value match
-                        if isinstance(value, str):
-                            if line[col_id] == value: matchs.append(line)
-                        
-                        # if value is function -> let it decide
-                        elif isinstance(value, function):
-                            if value(line[col_id]): matchs.append(line)
-                
-                # else, same thing but with no iteration (sad)
-                else:
-                    if isinstance(value, str):
-                        if line[col_id] == value: matchs.append(line)
-                    
-                    elif isinstance(value, function):
-                        if value(line[col_id]): matchs.append(line)
-
-        return matchs
+        if not criteria: return self.lines
+
+        ids = None
+
+        # Get the matching line ids of each criteria, and keep those matching all of them
+        for col, value in criteria.items():
+            matchs = set(self._criteria_matches(col, value))
+            ids = matchs if ids is None else ids & matchs
+
+            if not ids: return []
+
+        return self._rows(sorted(ids))
+
+    def _criteria_matches(self, column_name: str, value) -> Iterator[int]:
+        """
+        Returns the ids of the lines of a column matching a criteria (see findCriteria).
+        """
+
+        column = self._column(column_name)
+
+        # if crit is a tuple, any of its values / functions can match
+        if isinstance(value, tuple):
+            return chain.from_iterable(self._criteria_matches(column_name, crit) for crit in value)
+
+        # if value is function -> let it decide
+        if callable(value): return compress(count(), map(value, column))
+
+        return self._match_ids(column_name, value)
 
     def getColumn(self, column_name: str) -> list:
         """
         Attempts to get all the properties matching a column.
         """
-        
-        if column_name in self.columns: column_id = self.columns.index(column_name)
-        else: raise CarrotError('Couldn\'t find this column. Weird.')
 
-        return [line[column_id] for line in self.lines]
+        return list(self._column(column_name))
 
     # === Write methods === #
 
-    def add(self, *args, _submit = True) -> None:
+    def add(self, *args, _submit = False) -> None:
         """
         Adds a row to the csv file.
         """
@@ -184,49 +629,60 @@ class BaseCarrot:
         if len(args) < len(self.columns): raise CarrotError('Hum, there is missing columns, isn\'t it?')
         if len(args) > len(self.columns): raise CarrotError('Woops, there is too much columns!')
 
-        self.lines.append('\n' + self.sep.join(args))
+        line_id = len(self)
+        self.isSorted = False
+        self._display_cache = None
 
-        if _submit: self.submit()
+        for column, value in zip(self._cols, args): column.append(value)
+
+        for name, index in list(self._indices.items()):
+            try: index.setdefault(self._column(name)[line_id], []).append(line_id)
+            except TypeError: self._indices.pop(name) # unhashable slot, the column can't be indexed anymore
+
+        # Only the new line has to be written if the file is up to date
+        if _submit and not self._dirty: self._append(args)
+        else: self._commit(_submit)
     
-    def set(self, column: str, columnMatch: str, newValue: str, _submit = True) -> None:
+    def set(self, column: str, columnMatch: str, newValue: str, _submit = False) -> None:
         """
         Set the value of a slot.
         """
 
-        column_id = self._column_id
+        line_id = next(self._match_ids(column, columnMatch), None)
 
-        for line in self.lines:
-            if line[column_id] == str(columnMatch):
-                line[column_id] = newValue
-                break
-        
-        if _submit: self.submit()
+        self._invalidate(column)
+        if line_id is not None: self._column(column)[line_id] = newValue
+
+        self._commit(_submit)
     
-    def setAll(self, column: str, columnMatch: str, newValue: str, _submit = True) -> None:
+    def setAll(self, column: str, columnMatch: str, newValue: str, _submit = False) -> None:
         """
         Set the value for all mathing slots.
         """
 
-        column_id = self._column_id
+        ids = list(self._match_ids(column, columnMatch))
 
-        for line in self.lines:
-            if line[column_id] == str(columnMatch):
-                line[column_id] = newValue
-        
-        if _submit: self.submit()
+        self._invalidate(column)
+        column = self._column(column)
+
+        for i in ids: column[i] = newValue
+
+        self._commit(_submit)
     
-    def addColumn(self, name: str, defaultValue: str = 'UNDEF', _submit = True) -> None:
+    def addColumn(self, name: str, defaultValue: str = 'UNDEF', _submit = False) -> None:
         """
         Adds a column.
         """
 
-        self.columns.append(name)
+        if name in self._col_idx: raise CarrotError('There is already a column with this name.')
 
-        for line in self.lines: line = (*line, defaultValue)
+        self._cols.append([defaultValue] * len(self))
+        self._col_idx[name] = len(self.columns)
+        self.columns.append(name)
 
-        if _submit: self.submit()
+        self._commit(_submit)
     
-    def removeColumn(self, column, _submit = True) -> None:
+    def removeColumn(self, column, _submit = False) -> None:
         """
         Removes a column.
         """
@@ -234,10 +690,12 @@ class BaseCarrot:
         column_id = self._column_id(column)
 
         self.columns.pop(column_id)
+        self._index_columns()
 
-        for line in self.lines: line.pop(column_id)
+        del self._cols[column_id]
+        self._invalidate(column)
 
-        if _submit: self.submit()
+        self._commit(_submit)
 
     # === Advanced methods === #
 
@@ -256,9 +714,14 @@ class BaseCarrot:
         (In facts it's a list but with dictionarries in it.)
         """
 
-        out = [{col:line[i] for i, col in enumerate(self.columns)} for line in self.lines]
+        return list(self.iterDicts())
 
-        return out
+    def iterDicts(self) -> Iterator[dict]:
+        """
+        Iterate over the lines formated as dictionnaries, one at a time.
+        """
+
+        return map(dict, map(zip, repeat(self.columns), self._iter_rows()))
 
     def toJSON(self) -> str:
         """
@@ -274,9 +737,12 @@ class BaseCarrot:
         }
         """
 
-        out = {'columns': self.columns, 'content': self.toDict()}
+        import json # only loaded when needed, to keep importing Carrot fast
+
+        # Encode the lines one by one, instead of building all the dictionnaries first
+        content = ', '.join(map(json.dumps, self.iterDicts()))
 
-        return json.dumps(out)
+        return f'{{"columns": {json.dumps(self.columns)}, "content": [{content}]}}'
 
     # === Verification methods === #
 
@@ -295,28 +761,33 @@ class BaseCarrot:
         """
         
         # TODO: migrate this function here.
-        self._verify_integrity()
+        return self._verify_integrity()
 
-    def verify_doubles(self, _forceSorted = False) -> tuple(bool, Union[None, list]):
+    def verify_doubles(self, _forceSorted = False, column: str = None) -> tuple[bool, Union[None, list]]:
         """
-        Check if there is no doubles in the lines.
-        Will use a faster method if the list is already sorted (sort using self.sort)
+        Check if there is no doubles in the lines (or in the slots of a column, if given).
+        Returns (True, None) if there is none, else (False, list of the doubled values).
+        Will use a faster method if the column is already sorted (sort using self.sort)
         or by forcing using the _forceSorted bool.
         """
 
-        if _forceSorted or self.isSorted:
-            # Iterate throu aaaaaall elements
-            
-            pass
-        
+        values = list(self._iter_rows()) if column is None else self._column(column)
+
+        if _forceSorted or (self.isSorted and column is not None and column == self._sortedBy):
+            # Doubles are next to each other, compare each slot to the previous one
+            following = islice(values, 1, None)
+            doubles = [value for value, _ in groupby(compress(following, map(eq, islice(values, 1, None), values)))]
+
         else:
-            # faster method
+            # Count each value
+            try: doubles = [value for value, n in Counter(values).items() if n > 1]
+            except TypeError: raise CarrotError('Can\'t count unhashable slots, sort the column first.') from None
+
+        return (not doubles, doubles or None)
 
-            pass
-    
     # === Sorting functions === #
 
-    def sortColumns(self, order: list, _submit = True) -> None:
+    def sortColumns(self, order: list, _submit = False) -> None:
         """
         Change the order of the columns and of the slot.
         A list of columns can be found by calling the "self.columns" variable.
@@ -324,14 +795,28 @@ class BaseCarrot:
 
         pass
 
-    def sort(self, sortingColumn: str, _submit = True) -> None:
+    def sort(self, sortingColumn: str, _submit = False) -> None:
         """
-        Sort 
+        Sort the lines by the values of a column.
+        Lines with equal values keep their order.
         """
 
-        pass
-        
+        column = self._column(sortingColumn)
+        keys = column if isinstance(column, list) else list(column)
+
+        # Sort the line ids once, then move every column the same way
+        try: order = sorted(range(len(keys)), key = keys.__getitem__)
+        except TypeError: raise CarrotError('Can\'t sort a column with slots of different types.') from None
+
+        for column in self._cols:
+            if isinstance(column, list): column[:] = map(column.__getitem__, order)
+            else: column.reorder(order)
+
+        self._indices.clear()
+        self._commit(_submit)
+
         self.isSorted = True
+        self._sortedBy = sortingColumn
 
 
 
@@ -353,7 +838,7 @@ class New(BaseCarrot):
         Create a new Carrot instance by creating a new file.
         """
         
-        super().__init__(file = open(str(name), 'w+'))
+        super().__init__(file = open(str(name), 'w+', newline = ''))
 
 
 class From(BaseCarrot):
@@ -362,7 +847,7 @@ class From(BaseCarrot):
         Make Carrot open a csv file.
         """
 
-        super().__init__(file = open(str(path), 'r+'))
+        super().__init__(file = open(str(path), 'r+', newline = ''))
 
 
 if __name__ == '__main__': exit('Oh, hi, you!')
\ No newline at end of file
@@ -0,0 +1,362 @@
+"""
+Tests for the Carrot module. Run with `python -m unittest`.
+"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import Carrot
+
+
+class FileTest(unittest.TestCase):
+    """
+    Base class for tests working on a temporary csv file.
+    """
+
+    def setUp(self) -> None:
+        fd, self.path = tempfile.mkstemp(suffix = '.csv')
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+
+    def write(self, content: str) -> None:
+        with open(self.path, 'w', newline = '') as file: file.write(content)
+
+    def read(self) -> str:
+        with open(self.path, newline = '') as file: return file.read()
+
+    def load(self, content: str) -> Carrot.From:
+        """
+        Write content to the file and open it, the file being closed at the end of the test.
+        """
+
+        self.write(content)
+
+        csv = Carrot.From(self.path)
+        self.addCleanup(csv.file.close)
+
+        return csv
+
+
+class ParseTest(FileTest):
+
+    def test_quoted_fields(self) -> None:
+        csv = self.load('name,quote\n"Doe, John","He said ""hi"""\n\n"multi\nline",\n')
+
+        self.assertEqual(csv.columns, ['name', 'quote'])
+        self.assertEqual(csv.lines, [('Doe, John', 'He said "hi"'), ('multi\nline', '')])
+
+    def test_separator(self) -> None:
+        self.write('a;b\n1;"2;3"\n')
+
+        file = open(self.path, newline = '')
+        self.addCleanup(file.close)
+
+        self.assertEqual(Carrot.Carrot(file, sep = ';').lines, [('1', '2;3')])
+
+    def test_rewrite(self) -> None:
+        content = 'name,quote\n"Doe, John","He said ""hi"""\n"multi\nline",x\n'
+        csv = self.load(content)
+        csv.submit()
+
+        self.assertEqual(self.read(), content)
+
+
+class CategoricalColumnTest(FileTest):
+
+    def test_add_widens_codes(self) -> None:
+        # 256 distinct values over 2000 lines: the column is stored with 1 byte codes
+        csv = self.load('k,v\n' + ''.join(f'{i % 256},{i}\n' for i in range(2000)))
+        self.assertEqual(csv._column('k').codes.typecode, 'B')
+
+        csv.add('new', 'x')
+
+        self.assertEqual(csv._column('k').codes.typecode, 'H')
+        self.assertEqual(len(csv), 2001)
+        self.assertTrue(csv.verify_integrity())
+        self.assertEqual(csv.find('k', 'new'), ('new', 'x'))
+
+    def test_append_widens_codes(self) -> None:
+        column = Carrot._CategoricalColumn(list(range(0x10000)))
+        self.assertEqual(column.codes.typecode, 'H')
+
+        column.append(0x10000)
+
+        self.assertEqual(column.codes.typecode, 'L')
+        self.assertEqual(column[-1], 0x10000)
+        self.assertEqual(list(column), list(range(0x10001)))
+
+    def test_correct_type(self) -> None:
+        csv = self.load('country,k\n' + 'FR,1\nUS,2\nFR,1\nDE,3\n' * 10)
+        csv.correctType()
+
+        country, k = csv._cols
+        self.assertIsInstance(country, Carrot._CategoricalColumn)
+        self.assertIsInstance(k, Carrot._CategoricalColumn)
+        self.assertEqual(country.dictionary, ['FR', 'US', 'DE'])
+        self.assertEqual(k.dictionary, [1, 2, 3])
+        self.assertEqual(csv.lines[:4], [('FR', 1), ('US', 2), ('FR', 1), ('DE', 3)])
+
+    def test_recode_merges_slots(self) -> None:
+        # '1' and 1 have their own code until they are both converted to 1
+        column = Carrot._CategoricalColumn(['1', 1, '2', '1'])
+        column.recode(Carrot._infer(column.dictionary))
+
+        self.assertEqual(column.dictionary, [1, 2])
+        self.assertEqual(list(column), [1, 1, 2, 1])
+        self.assertEqual(list(column.matches(1)), [0, 1, 3])
+
+
+class CorrectTypeTest(FileTest):
+
+    def test_rewrite_keeps_text(self) -> None:
+        content = 'name,a,b,c,d\ndan,None,007,\'x\',1.50\nbob,4,1.5,"[1, 2]",2.25\n'
+        self.write(content)
+
+        with Carrot.From(self.path) as csv:
+            csv.correctType()
+            self.assertEqual(csv.lines, [('dan', 'None', '007', "'x'", '1.50'), ('bob', '4', '1.5', '[1, 2]', '2.25')])
+
+        self.assertEqual(self.read(), content)
+
+    def test_typed_column(self) -> None:
+        self.write('a,b,c,d\n1,2.5,True,"[1, 2]"\n3,4.0,False,[]\n5,6,True,"[3, 4]"\n')
+
+        with Carrot.From(self.path) as csv:
+            csv.correctType()
+            self.assertEqual(csv.getColumn('a'), [1, 3, 5])
+            self.assertEqual(csv.getColumn('b'), [2.5, 4.0, 6])
+            self.assertEqual(csv.getColumn('c'), [True, False, True])
+            self.assertEqual(csv.getColumn('d'), [[1, 2], [], [3, 4]])
+
+    def test_fixed_precision(self) -> None:
+        csv = self.load('p,n\n1.50,007\n2.25,8\n3.10,010\n')
+        csv.correctType()
+
+        self.assertEqual(csv.getColumn('p'), ['1.50', '2.25', '3.10'])
+        self.assertEqual(csv.getColumn('n'), ['007', '8', '010'])
+
+        csv.sort('p')
+        self.assertEqual(csv.find('p', '2.25'), ('2.25', '8'))
+
+
+class MatchTest(FileTest):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.csv = self.load('name,age\nbob,41\ndan,41\neve,30\n')
+
+    def check(self) -> None:
+        # Values match typed and untyped columns, given as written or as their type
+        for value in ('41', 41):
+            self.assertEqual(self.csv.find('age', value)[0], 'bob')
+            self.assertEqual(len(self.csv.findAll('age', value)), 2)
+            self.assertEqual(len(self.csv.findCriteria({'age': value})), 2)
+
+        self.csv.set('age', '30', 31)
+        self.assertEqual(self.csv.find('age', 31)[0], 'eve')
+
+        self.csv.setAll('age', '41', 42)
+        self.assertEqual(self.csv.getColumn('age')[:2], [42, 42])
+
+    def test_untyped(self) -> None:
+        self.check()
+
+    def test_typed(self) -> None:
+        self.csv.correctType()
+        self.check()
+
+    def test_indexed(self) -> None:
+        self.csv.correctType()
+        self.csv.buildIndex('age')
+        self.check()
+
+
+class CriteriaTest(FileTest):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.csv = self.load('name,city,age\nbob,Paris,41\ndan,Lyon,41\neve,Paris,30\nann,Paris,41\n')
+
+    def test_criteria(self) -> None:
+        self.assertEqual(self.csv.findCriteria({'city': 'Paris', 'age': '41'}), [('bob', 'Paris', '41'), ('ann', 'Paris', '41')])
+        self.assertEqual(self.csv.findCriteria({'city': 'Paris', 'name': ('eve', 'dan')}), [('eve', 'Paris', '30')])
+        self.assertEqual(self.csv.findCriteria({'age': lambda age: int(age) > 35, 'name': ('ann', str.isupper)}), [('ann', 'Paris', '41')])
+
+    def test_no_match(self) -> None:
+        self.assertEqual(self.csv.findCriteria({'city': 'Lyon', 'age': '30'}), [])
+        self.assertEqual(self.csv.findCriteria({'city': 'Nice'}), [])
+
+    def test_no_criteria(self) -> None:
+        self.assertEqual(self.csv.findCriteria(), self.csv.lines)
+
+
+class IntegrityTest(FileTest):
+
+    def test_integrity(self) -> None:
+        self.assertTrue(self.load('a,b\n1,2\n3,4\n').verify_integrity())
+        self.assertFalse(self.load('a,b\n1,2\n2,3,4\n').verify_integrity())
+        self.assertFalse(self.load('a,b\n1\n3,4\n').verify_integrity())
+
+    def test_integrity_after_submit(self) -> None:
+        csv = self.load('a,b\n1\n2,3\n')
+        csv.submit()
+
+        self.assertEqual(self.read(), 'a,b\n1,\n2,3\n')
+        self.assertTrue(csv.verify_integrity())
+
+
+class IndexTest(FileTest):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.csv = self.load('a,b\n1,x\n2,y\n')
+
+    def test_add_indexed(self) -> None:
+        self.csv.buildIndex('b')
+        self.csv.add('3', 'x')
+
+        self.assertEqual(self.csv.findAll('b', 'x'), [('1', 'x'), ('3', 'x')])
+
+    def test_add_unhashable(self) -> None:
+        self.csv.buildIndex('a')
+        self.csv.buildIndex('b')
+        self.csv.add('3', ['x'])
+
+        self.assertNotIn('b', self.csv._indices)
+        self.assertTrue(self.csv._dirty)
+        self.assertEqual(self.csv.find('a', '3'), ('3', ['x']))
+        self.assertEqual(self.csv.findAll('b', ['x']), [('3', ['x'])])
+
+
+class DoublesTest(FileTest):
+
+    def test_doubles(self) -> None:
+        csv = self.load('a,b\n1,x\n1,x\n2,x\n')
+
+        self.assertEqual(csv.verify_doubles(), (False, [('1', 'x')]))
+        self.assertEqual(csv.verify_doubles(True), (False, [('1', 'x')]))
+        self.assertEqual(csv.verify_doubles(column = 'b'), (False, ['x']))
+
+        csv.sort('a')
+        self.assertEqual(csv.verify_doubles(column = 'a'), (False, ['1']))
+
+
+class JSONTest(FileTest):
+
+    def check(self, csv: Carrot.From) -> None:
+        # Same text as dumping the whole structure at once
+        self.assertEqual(csv.toJSON(), json.dumps({'columns': csv.columns, 'content': csv.toDict()}))
+
+    def test_json(self) -> None:
+        csv = self.load('name,note\nbob,"say ""hi"""\nélo,"a\nb"\n')
+        self.check(csv)
+
+        csv.correctType()
+        csv.addColumn('n', None)
+        csv.set('name', 'bob', 4.5)
+        self.check(csv)
+
+    def test_empty(self) -> None:
+        self.check(self.load('a,b\n'))
+
+
+class DisplayTest(FileTest):
+
+    def display(self, csv: Carrot.From, *args) -> str:
+        with contextlib.redirect_stdout(io.StringIO()) as out: csv.display(*args)
+        return out.getvalue()
+
+    def test_cache_invalidation(self) -> None:
+        csv = self.load('a,b\n1,x\n')
+        self.assertEqual(self.display(csv), '\033[1m a | b\n----- \033[0m\n1 | x\n')
+
+        csv.set('b', 'x', 'y')
+        self.assertTrue(self.display(csv).endswith('1 | y\n'))
+
+        csv.add('2', 'z')
+        self.assertTrue(self.display(csv).endswith('1 | y\n2 | z\n'))
+
+        csv.addColumn('c', 0)
+        self.assertTrue(self.display(csv).endswith('1 | y | 0\n2 | z | 0\n'))
+
+        csv.setAll('c', 0, 3)
+        self.assertTrue(self.display(csv, (',', ';')).endswith('1,y,3;2,z,3\n'))
+
+        csv.parse()
+        self.assertTrue(self.display(csv).endswith('1 | x\n'))
+
+
+class SortTest(FileTest):
+
+    def test_stable(self) -> None:
+        csv = self.load('k,v\n' + ''.join(f'{k},{v}\n' for v, k in enumerate('bacabcab')))
+        self.assertIsInstance(csv._column('k'), Carrot._CategoricalColumn)
+
+        csv.sort('k')
+
+        self.assertEqual(csv.lines, [('a', '1'), ('a', '3'), ('a', '6'), ('b', '0'), ('b', '4'), ('b', '7'), ('c', '2'), ('c', '5')])
+        self.assertTrue(csv.isSorted)
+
+    def test_sort_typed(self) -> None:
+        csv = self.load('n\n10\n9\n100\n')
+
+        csv.sort('n')
+        self.assertEqual(csv.getColumn('n'), ['10', '100', '9'])
+
+        csv.correctType()
+        csv.sort('n')
+        self.assertEqual(csv.getColumn('n'), [9, 10, 100])
+
+    def test_mixed_types(self) -> None:
+        csv = self.load('n\n1\n2\n')
+        csv.set('n', '1', 1)
+
+        with self.assertRaises(Carrot.CarrotError): csv.sort('n')
+
+
+class AppendTest(FileTest):
+
+    def check(self, content: str, expected: str) -> None:
+        csv = self.load(content)
+        csv.add('5', '6', _submit = True)
+
+        self.assertEqual(self.read(), expected)
+
+    def test_append(self) -> None:
+        self.check('a,b\n1,2\n', 'a,b\n1,2\n5,6\n')
+
+    def test_append_crlf(self) -> None:
+        self.check('a,b\r\n1,2\r\n', 'a,b\r\n1,2\r\n5,6\r\n')
+
+    def test_append_glued(self) -> None:
+        self.check('a,b\n1,2', 'a,b\n1,2\n5,6\n')
+
+
+class CloseTest(FileTest):
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.write('a,b\n1,2\n')
+
+    def test_close_after_failed_write(self) -> None:
+        file = open(self.path, newline = '') # read only, writing fails
+        csv = Carrot.Carrot(file)
+        csv.correctType()
+
+        with self.assertRaises(OSError): csv.close()
+        self.assertTrue(file.closed)
+
+    def test_exit_after_failed_write(self) -> None:
+        file = open(self.path, newline = '')
+
+        with self.assertRaises(OSError):
+            with Carrot.Carrot(file) as csv: csv.add('3', '4')
+
+        self.assertTrue(file.closed)
+
+
+if __name__ == '__main__': unittest.main()